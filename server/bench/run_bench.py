@@ -0,0 +1,340 @@
+"""
+Offline ingestion benchmark.
+
+Starts local stand-ins for every upstream (bench/standins.py) in a child
+process, then drives
+  - fetch mode: each provider's fetch_* function, in a fresh worker process
+                per provider and size so peak RSS belongs to that provider
+  - api mode:   POST /ingest/ and GET /data/, /data/rollup on a uvicorn subprocess
+at the requested sizes and concurrency levels, and reports records/s,
+p50/p99 latency and peak RSS as JSON.
+
+Usage (from the server directory):
+    python bench/run_bench.py --sizes 100,1000 --concurrency 1,8 --output bench.json
+    python bench/run_bench.py --mode fetch --providers noaa,obis --baseline bench.json
+"""
+import argparse
+import concurrent.futures
+import datetime
+import json
+import math
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+from bench.standins import RemoteStandins  # noqa: E402
+
+ALL_PROVIDERS = ["noaa", "open-meteo", "obis", "worms", "bold", "fisheries", "csv", "ftp"]
+
+# providers that truncate their output regardless of the upstream response size
+RECORD_CAPS = {"noaa": "fetch_noaa returns at most MAX_RECORDS = 10 records per call"}
+
+
+def make_payload(provider: str, size: int, call: int, standins: RemoteStandins) -> Dict[str, Any]:
+    """A fresh payload per call; some providers mutate theirs (fetch_bold pops 'limit')."""
+    if provider == "noaa":
+        return {"station": "8723214", "product": "water_temperature", "begin_date": "20250801", "end_date": "20250802"}
+    if provider == "open-meteo":
+        return {"latitude": 9.93, "longitude": 76.26, "hourly": ["wave_height", "sea_surface_temperature"], "limit_hours": size}
+    if provider == "obis":
+        return {"endpoint": "occurrence", "params": {"scientificname": "Sardinella", "size": size}}
+    if provider == "worms":
+        return {"endpoint": "AphiaRecordsByName", "params": {"scientificname": "Sardinella"}, "limit": size}
+    if provider == "bold":
+        return {"endpoint": "specimen", "params": {"taxon": "Gadus", "format": "json", "limit": size}}
+    if provider == "fisheries":
+        return {}
+    if provider == "csv":
+        return {"url": f"{standins.base_url}/csv/fisheries.csv"}
+    if provider == "ftp":
+        # distinct names: fetch_ftp downloads into the working directory
+        return {"host": "127.0.0.1", "port": standins.ftp_port, "filepath": f"/pub/fisheries_{call}.csv", "filetype": "csv"}
+    raise ValueError(f"No benchmark payload for provider: {provider}")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    # nearest-rank
+    ordered = sorted(values)
+    k = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+
+def peak_rss_mb(pid: Optional[int] = None) -> float:
+    if pid is not None:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (rss_kb / 1024 / 1024) if sys.platform == "darwin" else rss_kb / 1024
+
+
+def measure(call: Callable[[int], int], calls: int, concurrency: int) -> Dict[str, Any]:
+    """Run `call(i)` `calls` times on `concurrency` threads; call returns records produced."""
+    latencies: List[float] = []
+    records = 0
+    errors: List[str] = []
+
+    def timed(i: int) -> Tuple[float, int]:
+        t = time.perf_counter()
+        n = call(i)
+        return time.perf_counter() - t, n
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for fut in concurrent.futures.as_completed([pool.submit(timed, i) for i in range(calls)]):
+            try:
+                elapsed, n = fut.result()
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            latencies.append(elapsed)
+            records += n
+    wall = time.perf_counter() - start
+
+    return {
+        "calls": calls,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "records": records,
+        "wall_s": round(wall, 4),
+        "records_per_s": round(records / wall, 1) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def bench_fetch(args, standins: RemoteStandins, workdir: str) -> List[Dict[str, Any]]:
+    results = []
+    for provider in args.providers:
+        for size in args.sizes:
+            standins.set_size(size)
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--fetch-worker", provider,
+                 "--sizes", str(size), "--concurrency", ",".join(map(str, args.concurrency)),
+                 "--calls", str(args.calls), "--standins", json.dumps(standins.info())],
+                # providers read their base URLs at import time; fetch_ftp downloads into cwd
+                cwd=workdir, env=dict(os.environ, **standins.env()),
+                stdout=subprocess.PIPE, text=True, check=True,
+            )
+            results += json.loads(out.stdout)
+    return results
+
+
+def fetch_worker(args) -> List[Dict[str, Any]]:
+    """One provider at one size, run in its own process by bench_fetch."""
+    from providers.registry import build_registry
+
+    standins = RemoteStandins.from_info(json.loads(args.standins))
+    provider, size = args.fetch_worker, args.sizes[0]
+    fetch = build_registry().get(provider)
+    fetch(make_payload(provider, size, -1, standins))  # warm up imports and the stand-in cache
+
+    results = []
+    for concurrency in args.concurrency:
+        stats = measure(
+            lambda i: len(fetch(make_payload(provider, size, i, standins))),
+            args.calls, concurrency,
+        )
+        stats.update(mode="fetch", target=provider, size=size, concurrency=concurrency, peak_rss_mb=round(peak_rss_mb(), 1))
+        results.append(stats)
+        log_row(stats)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_api(args, standins: RemoteStandins, workdir: str) -> List[Dict[str, Any]]:
+    import requests
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, **standins.env())
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", SERVER_DIR,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                if requests.get(f"{base}/data/?limit=1", timeout=1).status_code == 200:
+                    break
+            except requests.ConnectionError:
+                pass
+            if server.poll() is not None or time.time() > deadline:
+                raise RuntimeError("uvicorn did not start; see its output above")
+            time.sleep(0.2)
+
+        session = requests.Session()
+        session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=max(args.concurrency)))
+        results = []
+
+        def ingest(provider: str, size: int) -> Callable[[int], int]:
+            def call(i: int) -> int:
+                r = session.post(f"{base}/ingest/", json={"provider": provider, "payload": make_payload(provider, size, i, standins)}, timeout=300)
+                r.raise_for_status()
+                return len(r.json()["records"])
+            return call
+
+        def get(path: str) -> Callable[[int], int]:
+            def call(i: int) -> int:
+                r = session.get(f"{base}{path}", timeout=300)
+                r.raise_for_status()
+                body = r.json()
+                return len(body) if isinstance(body, list) else sum(len(s["points"]) for s in body["series"])
+            return call
+
+        queries = {
+            "/data/": "/data/",
+            "/data/ radius": "/data/?lat=9.93&lon=76.26&radius_km=50",
+            "/data/ bbox+source": "/data/?bbox=70,5,80,15&source=obis",
+            "/data/rollup": "/data/rollup?source=open-meteo&parameter=wave_height",
+        }
+
+        for size in args.sizes:
+            standins.set_size(size)
+            for concurrency in args.concurrency:
+                for provider in args.providers:
+                    stats = measure(ingest(provider, size), args.calls, concurrency)
+                    stats.update(mode="api", target=f"/ingest/ {provider}", size=size, concurrency=concurrency,
+                                 peak_rss_mb=round(peak_rss_mb(server.pid), 1))
+                    results.append(stats)
+                    log_row(stats)
+                for name, path in queries.items():
+                    stats = measure(get(path), args.calls, concurrency)
+                    stats.update(mode="api", target=name, size=size, concurrency=concurrency,
+                                 peak_rss_mb=round(peak_rss_mb(server.pid), 1))
+                    results.append(stats)
+                    log_row(stats)
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def result_key(r: Dict[str, Any]) -> Tuple:
+    return (r["mode"], r["target"], r["size"], r["concurrency"])
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float, rss_threshold: float) -> List[Dict[str, Any]]:
+    """
+    Results whose throughput dropped or p99 grew by more than `threshold`, or
+    whose peak RSS grew by more than `rss_threshold` (both fractions).
+    """
+    base = {result_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get(result_key(r))
+        if b is None:
+            continue
+        reasons = []
+        if b["records_per_s"] > 0 and r["records_per_s"] < b["records_per_s"] * (1 - threshold):
+            reasons.append(f"records/s {b['records_per_s']} -> {r['records_per_s']}")
+        if b["p99_ms"] > 0 and r["p99_ms"] > b["p99_ms"] * (1 + threshold):
+            reasons.append(f"p99 {b['p99_ms']}ms -> {r['p99_ms']}ms")
+        if b.get("peak_rss_mb", 0) > 0 and r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + rss_threshold):
+            reasons.append(f"peak RSS {b['peak_rss_mb']}MB -> {r['peak_rss_mb']}MB")
+        if reasons:
+            regressions.append({"key": list(result_key(r)), "reasons": reasons})
+    return regressions
+
+
+def log_row(r: Dict[str, Any]) -> None:
+    err = f"  errors={r['errors']} ({r['first_error']})" if r["errors"] else ""
+    print(
+        f"{r['mode']:5} {r['target']:24} size={r['size']:<7} c={r['concurrency']:<3} "
+        f"{r['records_per_s']:>11.1f} rec/s  p50={r['p50_ms']:>9.2f}ms  p99={r['p99_ms']:>9.2f}ms  "
+        f"rss={r['peak_rss_mb']:.0f}MB{err}",
+        file=sys.stderr,
+    )
+
+
+def _int_list(raw: str) -> List[int]:
+    return [int(v) for v in raw.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", default="fetch,api", help="fetch, api or both (comma separated)")
+    parser.add_argument("--providers", default=",".join(ALL_PROVIDERS))
+    parser.add_argument("--sizes", type=_int_list, default=[100, 1000], help="records per upstream response")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4])
+    parser.add_argument("--calls", type=int, default=20, help="calls per (target, size, concurrency)")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed throughput/p99 regression as a fraction (default 0.2)")
+    parser.add_argument("--rss-threshold", type=float, default=0.2, help="allowed peak RSS growth as a fraction (default 0.2)")
+    # internal: bench_fetch re-runs this script once per provider and size
+    parser.add_argument("--fetch-worker", help=argparse.SUPPRESS)
+    parser.add_argument("--standins", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fetch_worker:
+        print(json.dumps(fetch_worker(args)))
+        return
+
+    args.providers = [p.strip() for p in args.providers.split(",") if p.strip()]
+    modes = {m.strip() for m in args.mode.split(",")}
+    output, baseline = args.output, args.baseline
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as workdir, RemoteStandins(size=args.sizes[0]) as standins:
+        if "fetch" in modes:
+            results += bench_fetch(args, standins, workdir)
+        if "api" in modes:
+            results += bench_api(args, standins, workdir)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "calls": args.calls,
+            "peak_rss": (
+                "process high-water mark (ru_maxrss / VmHWM). fetch: a fresh worker per provider and size; "
+                "api: the uvicorn server, cumulative over the run"
+            ),
+            # records/s for these providers doesn't scale with --sizes and isn't comparable to the others
+            "record_caps": {p: note for p, note in RECORD_CAPS.items() if p in args.providers},
+        },
+        "results": results,
+    }
+
+    regressions: List[Dict[str, Any]] = []
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.rss_threshold)
+        report["regressions"] = regressions
+        for reg in regressions:
+            print(f"REGRESSION {' '.join(map(str, reg['key']))}: {'; '.join(reg['reasons'])}", file=sys.stderr)
+
+    out = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(out + "\n")
+    else:
+        print(out)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
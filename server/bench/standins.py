@@ -0,0 +1,364 @@
+"""
+Local stand-ins for the upstream services the providers talk to.
+
+Each stand-in replays a recorded fixture from bench/fixtures in the
+upstream's real response shape, scaled up to `size` records. Everything
+binds to 127.0.0.1, so a benchmark run never leaves the machine.
+
+`RemoteStandins` runs them in a child process (`python bench/standins.py`),
+so their threads and cached bodies don't count towards the memory of the
+process being measured.
+"""
+import copy
+import csv
+import datetime
+import io
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read() if name.endswith(".csv") else json.load(f)
+
+
+# ---------------------------------------------------------------------------
+# Fixture scaling: each function returns a response body with `size` records
+
+
+def scale_noaa(size: int, query: Dict[str, str]) -> dict:
+    fixture = load_fixture("noaa_datagetter.json")
+    sample = fixture["data"]
+    t0 = datetime.datetime.strptime(sample[0]["t"], "%Y-%m-%d %H:%M")
+    data = []
+    for i in range(size):
+        item = dict(sample[i % len(sample)])
+        item["t"] = (t0 + datetime.timedelta(minutes=6 * i)).strftime("%Y-%m-%d %H:%M")
+        data.append(item)
+    return {"metadata": fixture["metadata"], "data": data}
+
+
+def scale_noaa_metadata(size: int, query: Dict[str, str]) -> dict:
+    meta = load_fixture("noaa_datagetter.json")["metadata"]
+    return {"count": 1, "stations": [{"id": meta["id"], "name": meta["name"], "lat": float(meta["lat"]), "lng": float(meta["lon"])}]}
+
+
+def scale_open_meteo(size: int, query: Dict[str, str]) -> dict:
+    fixture = load_fixture("open_meteo_marine.json")
+    sample = fixture["hourly"]
+    t0 = datetime.datetime.fromisoformat(sample["time"][0])
+    hourly = {"time": [(t0 + datetime.timedelta(hours=i)).isoformat(timespec="minutes") for i in range(size)]}
+    for param in query.get("hourly", "wave_height,sea_surface_temperature").split(","):
+        values = sample.get(param) or sample["wave_height"]
+        hourly[param] = [values[i % len(values)] for i in range(size)]
+    fixture["hourly"] = hourly
+    return fixture
+
+
+def scale_obis(size: int, query: Dict[str, str]) -> dict:
+    fixture = load_fixture("obis_occurrence.json")
+    sample = fixture["results"]
+    results = []
+    for i in range(size):
+        item = copy.copy(sample[i % len(sample)])
+        item["id"] = f"{item['id'][:-6]}{i:06d}"
+        item["decimalLatitude"] = round(item["decimalLatitude"] + (i % 100) * 0.01, 4)
+        item["decimalLongitude"] = round(item["decimalLongitude"] + (i // 100 % 100) * 0.01, 4)
+        results.append(item)
+    return {"total": size, "results": results}
+
+
+def scale_worms(size: int, query: Dict[str, str]) -> list:
+    sample = load_fixture("worms_records.json")
+    out = []
+    for i in range(size):
+        item = dict(sample[i % len(sample)])
+        item["AphiaID"] = item["AphiaID"] + i
+        out.append(item)
+    return out
+
+
+def scale_bold(size: int, query: Dict[str, str]) -> dict:
+    sample = list(load_fixture("bold_specimen.json").values())
+    out = {}
+    for i in range(size):
+        item = dict(sample[i % len(sample)])
+        item["processid"] = f"BENCH{i:06d}-25"
+        out[item["processid"]] = item
+    return out
+
+
+def scale_data_gov(size: int, query: Dict[str, str]) -> dict:
+    fixture = load_fixture("data_gov_fisheries.json")
+    sample = fixture["records"]
+    offset, limit = int(query.get("offset", 0)), int(query.get("limit", 10))
+    fixture["records"] = [dict(sample[i % len(sample)]) for i in range(offset, min(offset + limit, size))]
+    fixture["total"], fixture["count"] = size, len(fixture["records"])
+    return fixture
+
+
+def scale_csv(size: int, query: Dict[str, str]) -> str:
+    rows = list(csv.reader(io.StringIO(load_fixture("fisheries.csv"))))
+    header, sample = rows[0], rows[1:]
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(header)
+    for i in range(size):
+        writer.writerow(sample[i % len(sample)])
+    return out.getvalue()
+
+
+# path prefix -> (scaler, content type); longest matching prefix wins
+ROUTES: Dict[str, Tuple[Callable[[int, Dict[str, str]], object], str]] = {
+    "/api/prod/datagetter": (scale_noaa, "application/json"),
+    "/mdapi/prod/webapi/stations/": (scale_noaa_metadata, "application/json"),
+    "/v1/marine": (scale_open_meteo, "application/json"),
+    "/v3/": (scale_obis, "application/json"),
+    "/rest/": (scale_worms, "application/json"),
+    "/API_Public/": (scale_bold, "application/json"),
+    "/resource/": (scale_data_gov, "application/json"),
+    "/csv/": (scale_csv, "text/csv"),
+}
+
+
+class StandinHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, size: int = 100):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.size = size
+        # called by GET /_bench/size?n=...; Standins points it at set_size
+        self.on_set_size: Optional[Callable[[int], None]] = None
+        self.requests_served = 0
+        self._cache: Dict[tuple, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def body_for(self, path: str, query: Dict[str, str]) -> Tuple[bytes, str]:
+        prefix = max((p for p in ROUTES if path.startswith(p)), key=len, default=None)
+        if prefix is None:
+            raise KeyError(path)
+        # bodies are cached so the stand-in costs as little as possible during a run
+        key = (prefix, self.size, tuple(sorted(query.items())))
+        with self._lock:
+            self.requests_served += 1
+            if key not in self._cache:
+                scaler, content_type = ROUTES[prefix]
+                body = scaler(self.size, query)
+                raw = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+                self._cache[key] = (raw, content_type)
+            return self._cache[key]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/_bench/size" and self.server.on_set_size is not None:
+            self.server.on_set_size(int(query["n"]))
+            self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        try:
+            body, content_type = self.server.body_for(url.path, query)
+        except KeyError:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Minimal passive-mode FTP server: just enough of RFC 959 for ftplib's
+# login / retrbinary / quit
+
+
+class StandinFTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, size: int = 100):
+        super().__init__(("127.0.0.1", 0), _FTPHandler)
+        self.size = size
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def file_body(self, path: str) -> bytes:
+        return scale_csv(self.size, {}).encode()
+
+
+class _FTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+        self.wfile.flush()
+
+    def handle(self):
+        passive = None
+        self.reply("220 bench stand-in ready")
+        for raw in self.rfile:
+            cmd, _, arg = raw.decode(errors="replace").strip().partition(" ")
+            cmd = cmd.upper()
+            if cmd == "USER":
+                self.reply("331 password please")
+            elif cmd == "PASS":
+                self.reply("230 logged in")
+            elif cmd == "TYPE":
+                self.reply("200 type set")
+            elif cmd == "PASV":
+                passive = socket.socket()
+                passive.bind(("127.0.0.1", 0))
+                passive.listen(1)
+                p = passive.getsockname()[1]
+                self.reply(f"227 Entering Passive Mode (127,0,0,1,{p >> 8},{p & 0xFF})")
+            elif cmd == "RETR":
+                if passive is None:
+                    self.reply("425 use PASV first")
+                    continue
+                self.reply("150 opening data connection")
+                conn, _ = passive.accept()
+                with conn:
+                    conn.sendall(self.server.file_body(arg))
+                passive.close()
+                passive = None
+                self.reply("226 transfer complete")
+            elif cmd == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+class Standins:
+    """Start both stand-ins in background threads and expose the env vars that point providers at them."""
+
+    def __init__(self, size: int = 100):
+        self.http = StandinHTTPServer(size)
+        self.ftp = StandinFTPServer(size)
+        self.http.on_set_size = self.set_size
+        self._threads = [
+            threading.Thread(target=s.serve_forever, daemon=True) for s in (self.http, self.ftp)
+        ]
+
+    @property
+    def base_url(self) -> str:
+        return self.http.base_url
+
+    @property
+    def ftp_port(self) -> int:
+        return self.ftp.port
+
+    def set_size(self, size: int) -> None:
+        self.http.size = size
+        self.ftp.size = size
+
+    def env(self) -> Dict[str, str]:
+        return standin_env(self.base_url)
+
+    def info(self) -> Dict[str, Any]:
+        return {"base_url": self.base_url, "ftp_port": self.ftp_port}
+
+    def __enter__(self):
+        for t in self._threads:
+            t.start()
+        return self
+
+    def __exit__(self, *exc):
+        for s in (self.http, self.ftp):
+            s.shutdown()
+            s.server_close()
+
+
+def standin_env(base: str) -> Dict[str, str]:
+    """Env vars that point the providers at the stand-ins."""
+    return {
+        "NOAA_BASE_URL": base,
+        "OPEN_METEO_MARINE_URL": base,
+        "OBIS_BASE_URL": f"{base}/v3",
+        "WORMS_BASE_URL": f"{base}/rest",
+        "BOLD_BASE_URL": f"{base}/API_Public",
+        "DATA_GOV_BASE_URL": base,
+        "DATA_GOV_API_KEY": "bench",
+    }
+
+
+class RemoteStandins:
+    """
+    Same interface as `Standins`, for stand-ins running in another process.
+    Started by the context manager, or attached to a running one with `from_info`.
+    """
+
+    def __init__(self, size: int = 100):
+        self.size = size
+        self.base_url = ""
+        self.ftp_port = 0
+        self._proc: Optional[subprocess.Popen] = None
+
+    @classmethod
+    def from_info(cls, info: Dict[str, Any]) -> "RemoteStandins":
+        remote = cls()
+        remote.base_url, remote.ftp_port = info["base_url"], info["ftp_port"]
+        return remote
+
+    def info(self) -> Dict[str, Any]:
+        return {"base_url": self.base_url, "ftp_port": self.ftp_port}
+
+    def env(self) -> Dict[str, str]:
+        return standin_env(self.base_url)
+
+    def set_size(self, size: int) -> None:
+        with urllib.request.urlopen(f"{self.base_url}/_bench/size?n={size}", timeout=10):
+            pass
+
+    def __enter__(self):
+        self._proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(self.size)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        line = self._proc.stdout.readline()
+        if not line:
+            self._proc.wait(timeout=10)
+            raise RuntimeError("stand-in process did not start; see its output above")
+        info = json.loads(line)
+        self.base_url, self.ftp_port = info["base_url"], info["ftp_port"]
+        return self
+
+    def __exit__(self, *exc):
+        # closing stdin tells the child to shut down
+        self._proc.stdin.close()
+        try:
+            self._proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+
+if __name__ == "__main__":
+    # child side of RemoteStandins: print where we listen, serve until stdin closes
+    with Standins(size=int(sys.argv[1]) if len(sys.argv) > 1 else 100) as standins:
+        print(json.dumps(standins.info()), flush=True)
+        sys.stdin.read()
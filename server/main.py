@@ -1,23 +1,19 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import os
 from dotenv import load_dotenv
-# from providers import fetch_open_meteo, fetch_fisheries, fetch_noaa , fetch_obis , fetch_worms , fetch_bold, fetch_csv, fetch_ftp
-from providers.fetch_open_meteo import fetch_open_meteo
-from providers.fetch_csv import fetch_csv
-from providers.fetch_fisheries import fetch_fisheries
-from providers.fetch_noaa import fetch_noaa
-from providers.fetch_obis import fetch_obis
-from providers.fetch_worms import fetch_worms
-from providers.fetch_bold import fetch_bold
-from providers.fetch_ftp import fetch_ftp
+import time
+import metrics
+# Provider modules are imported lazily by the registry on first use
+from providers.registry import build_registry
+from storage.record_store import RecordStore
+from storage.rollups import RESOLUTIONS, pick_resolution
+from storage.utils import parse_timestamp
 # from providers.fetch_cmfri import display_report
-from fastapi import APIRouter, Body 
+from fastapi import APIRouter, Body, Query
 
-import datetime
-import requests 
 load_dotenv()
 
 from fastapi.middleware.cors import CORSMiddleware
@@ -38,43 +34,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-database: List[Dict[str, Any]] = []
+# Records are kept in ingestion order; `store` also indexes them by location
+store = RecordStore()
 
-router = APIRouter()
 
+@app.middleware("http")
+async def instrument(request: Request, call_next):
+    """Request latency histogram, plus a Server-Timing phase breakdown when X-Profile is set."""
+    profile = metrics.start_profile() if request.headers.get("x-profile") else None
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
 
-# 🔹 NOAA fetch wrapper (singular product)
-def get_noaa_record(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """
-    Payload example:
-    {
-        "station": "8723214",
-        "product": "water_temperature",
-        "begin_date": "20250101",
-        "end_date": "20250105"
-    }
-    """
-    product = payload.get("product")
-    if not product or not isinstance(product, str):
-        raise HTTPException(status_code=400, detail="Must provide 'product' as a string")
+    route = request.scope.get("route")
+    metrics.HTTP_SECONDS.observe(elapsed, request.method, getattr(route, "path", "unmatched"), str(response.status_code))
+    if profile is not None:
+        # "total" is the ingest phase; this one also covers routing and serialization
+        profile["request"] = elapsed
+        response.headers["Server-Timing"] = metrics.server_timing(profile)
+    return response
 
-    records = fetch_noaa(payload)  # assumes fetch_noaa handles one product
-    return records
+router = APIRouter()
 
 
-PROVIDERS = {
-    "open-meteo": fetch_open_meteo,
-    "noaa": get_noaa_record,  # 🔹 now singular product
-    "obis": fetch_obis,
-    "worms": fetch_worms,
-    "bold": fetch_bold,
-    "fisheries": lambda payload: fetch_fisheries(
-        payload, api_key=os.environ.get("DATA_GOV_API_KEY")
-    ),
-    "csv": fetch_csv,
-    "ftp": fetch_ftp,
-    # "cmfri": display_report,
-}
+# Lazy registry: set OCEANIC_PROVIDERS="noaa,open-meteo" to start a worker with a subset
+PROVIDERS = build_registry()
+# PROVIDERS.register("cmfri", display_report)
 
 
 # Request model
@@ -85,7 +70,7 @@ class IngestRequest(BaseModel):
 
 @router.post("/providers/noaa")
 def noaa_endpoint(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
-    return get_noaa_record(payload)
+    return PROVIDERS["noaa"](payload)
 
 
 @app.post("/ingest/")
@@ -94,19 +79,175 @@ def ingest(req: IngestRequest):
     payload = req.payload
 
     if provider not in PROVIDERS:
+        metrics.INGEST_REQUESTS.inc("unknown", "unknown_provider")
         raise HTTPException(status_code=400, detail=f"Unknown provider: {provider}")
 
     try:
-        records = PROVIDERS[provider](payload)
-        database.extend(records)
-        return {"status": "success", "records": records}
+        with metrics.phase(provider, "total"):
+            records = PROVIDERS[provider](payload)
+            with metrics.phase(provider, "store"):
+                store.extend(records)
+    except HTTPException as e:
+        # provider already chose a status (bad payload, no data, ...)
+        metrics.INGEST_REQUESTS.inc(provider, f"http_{e.status_code}")
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ingestion failed: {e}")
+        result, status = _classify_error(e)
+        metrics.INGEST_REQUESTS.inc(provider, result)
+        raise HTTPException(status_code=status, detail=f"Ingestion failed ({result}): {e}")
+
+    metrics.INGEST_REQUESTS.inc(provider, "success")
+    metrics.RECORDS_PRODUCED.inc(provider, amount=len(records))
+    return {"status": "success", "records": records}
+
+
+def _classify_error(e: Exception):
+    """(result label, HTTP status) for an exception raised while ingesting."""
+    import requests  # already loaded by any provider that can raise its errors
+
+    # only failures while decoding/validating upstream responses; payload
+    # problems are raised by providers as HTTPException(400)
+    if isinstance(e, (metrics.UpstreamDataError, requests.JSONDecodeError)):
+        return "invalid_data", 502
+    if isinstance(e, requests.Timeout):
+        return "upstream_timeout", 504
+    if isinstance(e, requests.HTTPError):
+        return "upstream_error", 502
+    if isinstance(e, requests.RequestException):
+        return "upstream_unreachable", 502
+    return "internal_error", 500
+
+
+def _split(values: Optional[List[str]]) -> Optional[List[str]]:
+    # accepts both ?source=a&source=b and ?source=a,b
+    if not values:
+        return None
+    return [v.strip() for value in values for v in value.split(",") if v.strip()]
+
+
+def _parse_floats(raw: str, name: str) -> List[float]:
+    try:
+        return [float(v) for v in raw.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"'{name}' must be comma separated numbers")
+
+
+def _parse_time(raw: Optional[str], name: str):
+    if raw is None:
+        return None
+    ts = parse_timestamp(raw)
+    if ts is None:
+        raise HTTPException(status_code=400, detail=f"'{name}' must be an ISO 8601 timestamp")
+    return ts
 
 
 @app.get("/data/")
-def get_data() -> List[Dict[str, Any]]:
-    return database
+def get_data(
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat; min_lon > max_lon crosses the antimeridian"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0),
+    polygon: Optional[str] = Query(None, description="lon,lat;lon,lat;... (at least 3 vertices, must not cross the antimeridian)"),
+    source: Optional[List[str]] = Query(None, description="e.g. NOAA, obis, open-meteo"),
+    parameter: Optional[List[str]] = Query(None, description="e.g. water_temperature"),
+    start: Optional[str] = Query(None, description="ISO 8601, inclusive"),
+    end: Optional[str] = Query(None, description="ISO 8601, inclusive"),
+    limit: Optional[int] = Query(None, gt=0),
+) -> List[Dict[str, Any]]:
+    """
+    All ingested records, optionally filtered. Spatial filters combine with
+    each other and with source/parameter/time filters, e.g.
+    /data/?lat=9.93&lon=76.26&radius_km=50&start=2025-08-01T00:00:00
+    """
+    bbox_q = None
+    if bbox is not None:
+        bbox_q = _parse_floats(bbox, "bbox")
+        if len(bbox_q) != 4:
+            raise HTTPException(status_code=400, detail="'bbox' must be min_lon,min_lat,max_lon,max_lat")
+        min_lon, min_lat, max_lon, max_lat = bbox_q
+        if not all(-180 <= x <= 180 for x in (min_lon, max_lon)) or not all(-90 <= y <= 90 for y in (min_lat, max_lat)):
+            raise HTTPException(status_code=400, detail="'bbox' longitudes must be within ±180 and latitudes within ±90")
+        if min_lat > max_lat:
+            raise HTTPException(status_code=400, detail="'bbox' min_lat must not be greater than max_lat")
+        bbox_q = tuple(bbox_q)
+
+    near = None
+    if lat is not None or lon is not None or radius_km is not None:
+        if lat is None or lon is None or radius_km is None:
+            raise HTTPException(status_code=400, detail="Radius queries need 'lat', 'lon' and 'radius_km'")
+        near = (lat, lon, radius_km)
+
+    polygon_q = None
+    if polygon is not None:
+        polygon_q = [tuple(_parse_floats(p, "polygon")) for p in polygon.split(";") if p.strip()]
+        if len(polygon_q) < 3 or any(len(p) != 2 for p in polygon_q):
+            raise HTTPException(status_code=400, detail="'polygon' must be at least 3 'lon,lat' pairs separated by ';'")
+        if not all(-180 <= x <= 180 and -90 <= y <= 90 for x, y in polygon_q):
+            raise HTTPException(status_code=400, detail="'polygon' longitudes must be within ±180 and latitudes within ±90")
+        # vertices are joined with straight lon/lat edges, so a ring spanning more than
+        # 180° of longitude is ambiguous; callers split such areas at the antimeridian
+        if max(x for x, _ in polygon_q) - min(x for x, _ in polygon_q) > 180:
+            raise HTTPException(status_code=400, detail="'polygon' must not cross the antimeridian; split it into two polygons")
+
+    filters = dict(
+        bbox=bbox_q,
+        near=near,
+        polygon=polygon_q,
+        sources=_split(source),
+        parameters=_split(parameter),
+        start=_parse_time(start, "start"),
+        end=_parse_time(end, "end"),
+        limit=limit,
+    )
+    if not any(v is not None for v in filters.values()):
+        return store.snapshot()
+    return store.query(**filters)
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/data/rollup")
+def get_rollup(
+    parameter: str = Query(..., description="e.g. water_temperature, wave_height"),
+    source: Optional[str] = Query(None, description="e.g. NOAA, open-meteo"),
+    station: Optional[str] = Query(None),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="with lon, selects the grid cell series"),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    start: Optional[str] = Query(None, description="ISO 8601, inclusive"),
+    end: Optional[str] = Query(None, description="ISO 8601, inclusive"),
+    resolution: Optional[str] = Query(None, description="hourly, daily or monthly; picked from the span if omitted"),
+) -> Dict[str, Any]:
+    """
+    Min/mean/max/count per time bucket for each matching series, maintained
+    as records are ingested.
+    """
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="Cell series need both 'lat' and 'lon'")
+    if resolution is not None and resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"'resolution' must be one of {', '.join(RESOLUTIONS)}")
+
+    start_ts, end_ts = _parse_time(start, "start"), _parse_time(end, "end")
+
+    # one lock for series/extent/query so the response reflects a single point in time
+    with store.rollups.lock:
+        keys = store.rollups.series(source=source, parameter=parameter, station=station, lat=lat, lon=lon)
+        if resolution is None:
+            extent = store.rollups.extent(keys)
+            if extent is None:
+                resolution = "hourly"
+            else:
+                resolution = pick_resolution(start_ts or extent[0], end_ts or extent[1])
+        series = store.rollups.query(keys, resolution, start=start_ts, end=end_ts)
+
+    return {
+        "resolution": resolution,
+        "start": start_ts.isoformat() if start_ts else None,
+        "end": end_ts.isoformat() if end_ts else None,
+        "series": series,
+    }
 
 
 
@@ -0,0 +1,223 @@
+"""
+In-process metrics for the ingestion hot path, rendered in the Prometheus
+text exposition format by GET /metrics.
+
+Providers call `upstream_get` instead of `requests.get` and wrap their
+decode / validate steps in `phase(...)`. Exceptions escaping those two
+phases are re-raised as `UpstreamDataError`, so the API can tell bad
+upstream data apart from a bad client payload. When a request opts in to
+profiling (X-Profile header), the same timings are also collected per
+request and returned in a Server-Timing header.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+_lock = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        # copy under the lock: a scrape can race with a new label set being added
+        with _lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with _lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> List[str]:
+        with _lock:
+            values = sorted((k, list(row)) for k, row in self._values.items())
+        lines = self.header()
+        for k, row in values:
+            for bound, n in zip(self.buckets, row):
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, k, le)} {_fmt(n)}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, k, inf)} {_fmt(row[-1])}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, k)} {_fmt(row[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, k)} {_fmt(row[-1])}")
+        return lines
+
+
+# ---------------------------------------------------------------------------
+# Metrics exported at /metrics
+
+PHASE_SECONDS = Histogram(
+    "oceanic_provider_phase_seconds",
+    "Time spent per provider in each ingestion phase (upstream, decode, validate, store, total).",
+    ("provider", "phase"),
+)
+UPSTREAM_BYTES = Counter("oceanic_upstream_bytes_total", "Response bytes downloaded from upstream services.", ("provider",))
+UPSTREAM_REQUESTS = Counter("oceanic_upstream_requests_total", "Upstream requests by outcome.", ("provider", "outcome"))
+UPSTREAM_IN_FLIGHT = Gauge("oceanic_upstream_in_flight", "Upstream requests currently waiting on a response.", ("provider",))
+RECORDS_PRODUCED = Counter("oceanic_records_produced_total", "Records returned by providers and stored.", ("provider",))
+RECORDS_REJECTED = Counter("oceanic_records_rejected_total", "Upstream items dropped as missing or invalid.", ("provider",))
+INGEST_REQUESTS = Counter("oceanic_ingest_requests_total", "/ingest/ calls by provider and result.", ("provider", "result"))
+CACHE_LOOKUPS = Counter("oceanic_cache_lookups_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result"))
+HTTP_SECONDS = Histogram("oceanic_http_request_seconds", "API request latency by route.", ("method", "route", "status"))
+
+ALL_METRICS = [
+    PHASE_SECONDS, UPSTREAM_BYTES, UPSTREAM_REQUESTS, UPSTREAM_IN_FLIGHT, RECORDS_PRODUCED,
+    RECORDS_REJECTED, INGEST_REQUESTS, CACHE_LOOKUPS, HTTP_SECONDS,
+]
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Per-request profiling
+
+# phase -> seconds for the current request, when profiling was requested
+_profile: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("oceanic_profile", default=None)
+
+
+def start_profile() -> Dict[str, float]:
+    profile: Dict[str, float] = {}
+    _profile.set(profile)
+    return profile
+
+
+def server_timing(profile: Dict[str, float]) -> str:
+    """Server-Timing header value, e.g. 'upstream;dur=120.4, decode;dur=3.1, request;dur=130.2'."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in profile.items())
+
+
+def _record_phase(provider: str, name: str, seconds: float) -> None:
+    PHASE_SECONDS.observe(seconds, provider, name)
+    profile = _profile.get()
+    if profile is not None:
+        with _lock:
+            profile[name] = profile.get(name, 0.0) + seconds
+
+
+DATA_PHASES = ("decode", "validate")
+
+
+class UpstreamDataError(Exception):
+    """An upstream response could not be decoded or validated."""
+
+    def __init__(self, provider: str, phase: str, cause: Exception):
+        super().__init__(f"{provider} {phase} failed: {type(cause).__name__}: {cause}")
+        self.provider = provider
+        self.phase = phase
+
+
+@contextlib.contextmanager
+def phase(provider: str, name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        # exceptions that already carry an HTTP status (HTTPException) pass through
+        if name in DATA_PHASES and getattr(e, "status_code", None) is None and not isinstance(e, UpstreamDataError):
+            raise UpstreamDataError(provider, name, e) from e
+        raise
+    finally:
+        _record_phase(provider, name, time.perf_counter() - start)
+
+
+def rejected(provider: str, n: int = 1) -> None:
+    if n:
+        RECORDS_REJECTED.inc(provider, amount=n)
+
+
+def upstream_get(provider: str, url: str, **kwargs):
+    """requests.get with in-flight, latency, bytes and outcome tracking."""
+    import requests
+
+    UPSTREAM_IN_FLIGHT.inc(provider)
+    start = time.perf_counter()
+    try:
+        r = requests.get(url, **kwargs)
+    except requests.Timeout:
+        UPSTREAM_REQUESTS.inc(provider, "timeout")
+        raise
+    except requests.RequestException:
+        UPSTREAM_REQUESTS.inc(provider, "error")
+        raise
+    finally:
+        UPSTREAM_IN_FLIGHT.dec(provider)
+        _record_phase(provider, "upstream", time.perf_counter() - start)
+    UPSTREAM_BYTES.inc(provider, amount=len(r.content))
+    UPSTREAM_REQUESTS.inc(provider, str(r.status_code))
+    return r
@@ -5,6 +5,9 @@ import os
 import requests
 from models.data_models import StandardizedRecord
 from fastapi import HTTPException
+import metrics
+
+BOLD_BASE_URL = os.environ.get("BOLD_BASE_URL", "http://www.boldsystems.org/index.php/API_Public")
 
 def fetch_bold(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -14,15 +17,19 @@ def fetch_bold(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     endpoint = payload.get("endpoint", "specimen")
     params = payload.get("params", {})
-    base = "http://www.boldsystems.org/index.php/API_Public"
+    base = BOLD_BASE_URL
     url = f"{base}/{endpoint}"
 
     # Pop limit if user passed it, default 20
-    limit = int(params.pop("limit", 20))
+    try:
+        limit = int(params.pop("limit", 20))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="'limit' must be an integer")
 
-    r = requests.get(url, params=params, timeout=30)
+    r = metrics.upstream_get("bold", url, params=params, timeout=30)
     r.raise_for_status()
-    data = r.json()
+    with metrics.phase("bold", "decode"):
+        data = r.json()
 
     records = []
     if isinstance(data, dict):
@@ -30,19 +37,22 @@ def fetch_bold(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
             if isinstance(val, dict):
                 val["id"] = key
                 records.append(val)
+            else:
+                metrics.rejected("bold")
     elif isinstance(data, list):
         records.extend(data)
 
     # Apply client-side limit
     records = records[:limit]
 
-    return [{
-        "processid": item.get("processid"),
-        "species_name": item.get("species_name"),
-        "lat": item.get("lat"),
-        "lon": item.get("lon"),
-        "marker": item.get("marker"),
-        "genbank_accession": item.get("genbank_accession"),
-        "timestamp": datetime.datetime.now().isoformat(),
-        "source": f"bold/{endpoint}"
-    } for item in records]
\ No newline at end of file
+    with metrics.phase("bold", "validate"):
+        return [{
+            "processid": item.get("processid"),
+            "species_name": item.get("species_name"),
+            "lat": item.get("lat"),
+            "lon": item.get("lon"),
+            "marker": item.get("marker"),
+            "genbank_accession": item.get("genbank_accession"),
+            "timestamp": datetime.datetime.now().isoformat(),
+            "source": f"bold/{endpoint}"
+        } for item in records]
\ No newline at end of file
@@ -4,7 +4,7 @@ import os
 import requests
 from models.data_models import StandardizedRecord
 from fastapi import HTTPException
-import pandas as pd
+import metrics
 from io import StringIO
 # from providers.fetch_csv import fetch_csv
 
@@ -15,16 +15,39 @@ def fetch_csv(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
       {"path": "/data/fisheries.csv"}
       {"url": "https://example.com/fisheries.csv"}
     """
-    try:
-        if "url" in payload:
-            r = requests.get(payload["url"], timeout=30)
-            r.raise_for_status()
+    import pandas as pd  # heavy, only pay for it when CSV ingestion is used
+
+    if "url" in payload:
+        r = metrics.upstream_get("csv", payload["url"], timeout=30)
+        r.raise_for_status()
+        with metrics.phase("csv", "decode"):
             df = pd.read_csv(StringIO(r.text))
-        elif "path" in payload:
-            df = pd.read_csv(payload["path"])
-        else:
-            raise ValueError("Payload must include either 'url' or 'path' for CSV source.")
+    elif "path" in payload:
+        if not os.path.isfile(payload["path"]):
+            raise HTTPException(status_code=400, detail=f"CSV file not found: {payload['path']}")
+        # the client's own file: a parse failure is a bad payload, not bad upstream data
+        with metrics.phase("csv", "decode"):
+            try:
+                df = pd.read_csv(payload["path"])
+            except ValueError as e:  # pandas' ParserError / EmptyDataError, bad encodings
+                raise HTTPException(status_code=400, detail=f"Could not parse CSV file {payload['path']}: {e}")
+    else:
+        raise HTTPException(status_code=400, detail="Payload must include either 'url' or 'path' for CSV source.")
+
+    return _standardize(df, "csv")
+
+
+def read_csv_records(path: str, provider: str) -> List[Dict[str, Any]]:
+    """Standardize a CSV file downloaded from `provider` (e.g. by fetch_ftp); parse failures count as bad upstream data."""
+    import pandas as pd
+
+    with metrics.phase(provider, "decode"):
+        df = pd.read_csv(path)
+    return _standardize(df, provider)
+
 
+def _standardize(df, provider: str) -> List[Dict[str, Any]]:
+    with metrics.phase(provider, "validate"):
         records = []
         for _, row in df.iterrows():
             record = {
@@ -33,6 +56,4 @@ def fetch_csv(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
                 **row.to_dict()
             }
             records.append(record)
-        return records
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"CSV ingestion failed: {e}")
\ No newline at end of file
+    return records
@@ -4,6 +4,8 @@ import os
 import requests
 from models.data_models import StandardizedRecord
 from fastapi import HTTPException
+import metrics
+import ftplib
 from ftplib import FTP
 import os
 
@@ -16,7 +18,8 @@ def fetch_ftp(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         "user": "anonymous",
         "passwd": "anonymous@",
         "filepath": "/data/fisheries.csv",
-        "filetype": "csv"
+        "filetype": "csv",
+        "port": 21
       }
     """
     host = payload.get("host")
@@ -24,24 +27,40 @@ def fetch_ftp(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     passwd = payload.get("passwd", "anonymous@")
     filepath = payload.get("filepath")
     filetype = payload.get("filetype", "csv")
+    try:
+        port = int(payload.get("port", 21))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="'port' must be an integer")
 
     if not host or not filepath:
         raise HTTPException(status_code=400, detail="Missing 'host' or 'filepath' for FTP fetcher.")
 
-    try:
-        ftp = FTP(host)
-        ftp.login(user=user, passwd=passwd)
-        local_filename = os.path.basename(filepath)
+    if filetype != "csv":
+        raise HTTPException(status_code=400, detail=f"Unsupported filetype from FTP: {filetype}")
 
-        with open(local_filename, "wb") as f:
-            ftp.retrbinary(f"RETR {filepath}", f.write)
-        ftp.quit()
+    local_filename = os.path.basename(filepath)
+    metrics.UPSTREAM_IN_FLIGHT.inc("ftp")
+    try:
+        with metrics.phase("ftp", "upstream"):
+            ftp = FTP(timeout=30)
+            ftp.connect(host, port)
+            ftp.login(user=user, passwd=passwd)
 
-        # Once file is downloaded → delegate to appropriate parser
-        if filetype == "csv":
-            return fetch_csv({"path": local_filename})
-        else:
-            raise ValueError(f"Unsupported filetype from FTP: {filetype}")
+            with open(local_filename, "wb") as f:
+                ftp.retrbinary(f"RETR {filepath}", f.write)
+            ftp.quit()
+    except TimeoutError as e:
+        metrics.UPSTREAM_REQUESTS.inc("ftp", "timeout")
+        raise HTTPException(status_code=504, detail=f"FTP transfer timed out: {e}")
+    except ftplib.all_errors as e:
+        # connection refused, DNS failures, 5xx replies, dropped transfers
+        metrics.UPSTREAM_REQUESTS.inc("ftp", "error")
+        raise HTTPException(status_code=502, detail=f"FTP transfer failed: {e}")
+    finally:
+        metrics.UPSTREAM_IN_FLIGHT.dec("ftp")
+    metrics.UPSTREAM_REQUESTS.inc("ftp", "ok")
+    metrics.UPSTREAM_BYTES.inc("ftp", amount=os.path.getsize(local_filename))
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"FTP ingestion failed: {e}")
\ No newline at end of file
+    # Once file is downloaded → delegate to appropriate parser
+    from providers.fetch_csv import read_csv_records
+    return read_csv_records(local_filename, provider="ftp")
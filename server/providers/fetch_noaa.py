@@ -4,6 +4,9 @@ import os
 import requests
 from models.data_models import StandardizedRecord
 from fastapi import HTTPException
+import metrics
+
+NOAA_BASE_URL = os.environ.get("NOAA_BASE_URL", "https://api.tidesandcurrents.noaa.gov")
 
 
 def fetch_noaa(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -36,7 +39,7 @@ def fetch_noaa(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     if product not in VALID_PRODUCTS:
         raise HTTPException(status_code=400, detail=f"Unsupported NOAA product: {product}")
 
-    url = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+    url = f"{NOAA_BASE_URL}/api/prod/datagetter"
     params = {
         "product": product,
         "station": station,
@@ -50,9 +53,10 @@ def fetch_noaa(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         if key in payload:
             params[key] = payload[key]
 
-    r = requests.get(url, params=params, timeout=30)
+    r = metrics.upstream_get("noaa", url, params=params, timeout=30)
     r.raise_for_status()
-    data = r.json()
+    with metrics.phase("noaa", "decode"):
+        data = r.json()
 
     if "data" not in data or not data["data"]:
         raise HTTPException(status_code=404, detail="No data found from NOAA")
@@ -61,31 +65,52 @@ def fetch_noaa(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     meta = data.get("metadata", {})
     if not meta:
         try:
-            meta_url = f"https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations/{station}/metadata.json"
-            meta_resp = requests.get(meta_url, timeout=10)
-            meta_data = meta_resp.json().get("stations", [{}])[0]
+            meta_url = f"{NOAA_BASE_URL}/mdapi/prod/webapi/stations/{station}/metadata.json"
+            meta_resp = metrics.upstream_get("noaa", meta_url, timeout=10)
+            meta_resp.raise_for_status()
+            meta_data = (meta_resp.json().get("stations") or [{}])[0]
             meta["lat"] = meta_data.get("lat")
             meta["lon"] = meta_data.get("lng")
         except Exception:
             pass  # fallback to empty metadata
 
     records = []
-    for item in data["data"]:
-        raw_time = item["t"].replace(" ", "T")
-        try:
-            timestamp = datetime.datetime.fromisoformat(raw_time)
-        except ValueError:
-            timestamp = datetime.datetime.strptime(raw_time, "%Y-%m-%dT%H:%M:%S")
-
-        records.append(StandardizedRecord(
-            station=station,
-            latitude=meta.get("lat"),
-            longitude=meta.get("lon"),
-            parameter=product,
-            value=float(item["v"]),
-            timestamp=timestamp,
-            source="NOAA"
-        ).model_dump())
+    with metrics.phase("noaa", "validate"):
+        for item in data["data"]:
+            raw_time = item["t"].replace(" ", "T")
+            try:
+                timestamp = datetime.datetime.fromisoformat(raw_time)
+            except ValueError:
+                timestamp = datetime.datetime.strptime(raw_time, "%Y-%m-%dT%H:%M:%S")
+
+            records.append(StandardizedRecord(
+                station=station,
+                latitude=meta.get("lat"),
+                longitude=meta.get("lon"),
+                parameter=product,
+                value=float(item["v"]),
+                timestamp=timestamp,
+                source="NOAA"
+            ).model_dump())
 
     MAX_RECORDS = 10  # safety cap for UI
-    return records[:MAX_RECORDS]
\ No newline at end of file
+    return records[:MAX_RECORDS]
+
+
+# 🔹 NOAA fetch wrapper (singular product), registered as the "noaa" provider
+def get_noaa_record(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Payload example:
+    {
+        "station": "8723214",
+        "product": "water_temperature",
+        "begin_date": "20250101",
+        "end_date": "20250105"
+    }
+    """
+    product = payload.get("product")
+    if not product or not isinstance(product, str):
+        raise HTTPException(status_code=400, detail="Must provide 'product' as a string")
+
+    records = fetch_noaa(payload)  # assumes fetch_noaa handles one product
+    return records
@@ -4,6 +4,9 @@ import os
 import requests
 from models.data_models import StandardizedRecord
 from fastapi import HTTPException
+import metrics
+
+OBIS_BASE_URL = os.environ.get("OBIS_BASE_URL", "https://api.obis.org/v3")
 
 def fetch_obis(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -16,36 +19,38 @@ def fetch_obis(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     endpoint = payload.get("endpoint", "occurrence")
     params = payload.get("params", {"size": 10})
-    base = "https://api.obis.org/v3"
+    base = OBIS_BASE_URL
     url = f"{base}/{endpoint}"
 
-    r = requests.get(url, params=params, timeout=30)
+    r = metrics.upstream_get("obis", url, params=params, timeout=30)
     r.raise_for_status()
-    data = r.json()
+    with metrics.phase("obis", "decode"):
+        data = r.json()
 
     items = data.get("results", data.get("data", []))
     records = []
 
-    for item in items:
-        lat = item.get("decimalLatitude")
-        lon = item.get("decimalLongitude")
-
-        # Build structured record
-        record = {
-            "latitude": lat,
-            "longitude": lon,
-            "species": item.get("scientificName"),
-            "taxonRank": item.get("taxonRank"),
-            "family": item.get("family"),
-            "order": item.get("order"),
-            "class": item.get("class"),
-            "basisOfRecord": item.get("basisOfRecord"),  # e.g., HumanObservation
-            "depth": item.get("depth"),
-            "eventDate": item.get("eventDate"),
-            "timestamp": datetime.datetime.now().isoformat(),
-            "source": f"obis/{endpoint}"
-        }
-
-        records.append(record)
+    with metrics.phase("obis", "validate"):
+        for item in items:
+            lat = item.get("decimalLatitude")
+            lon = item.get("decimalLongitude")
+
+            # Build structured record
+            record = {
+                "latitude": lat,
+                "longitude": lon,
+                "species": item.get("scientificName"),
+                "taxonRank": item.get("taxonRank"),
+                "family": item.get("family"),
+                "order": item.get("order"),
+                "class": item.get("class"),
+                "basisOfRecord": item.get("basisOfRecord"),  # e.g., HumanObservation
+                "depth": item.get("depth"),
+                "eventDate": item.get("eventDate"),
+                "timestamp": datetime.datetime.now().isoformat(),
+                "source": f"obis/{endpoint}"
+            }
+
+            records.append(record)
 
     return records 
\ No newline at end of file
@@ -4,6 +4,9 @@ import os
 import requests
 from models.data_models import StandardizedRecord
 from fastapi import HTTPException
+import metrics
+
+OPEN_METEO_MARINE_URL = os.environ.get("OPEN_METEO_MARINE_URL", "https://marine-api.open-meteo.com")
 
 def fetch_open_meteo(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -15,35 +18,44 @@ def fetch_open_meteo(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         "hourly": ["wave_height", "sea_surface_temperature"]
     }
     """
-    url = "https://marine-api.open-meteo.com/v1/marine"
+    try:
+        limit_hours = int(payload.get("limit_hours", 6))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="'limit_hours' must be an integer")
+
+    url = f"{OPEN_METEO_MARINE_URL}/v1/marine"
     params = {
         "latitude": payload.get("latitude"),
         "longitude": payload.get("longitude"),
         "hourly": ",".join(payload.get("hourly", ["wave_height", "sea_surface_temperature" ])),
     }
 
-    r = requests.get(url, params=params, timeout=30)
+    r = metrics.upstream_get("open-meteo", url, params=params, timeout=30)
     r.raise_for_status()
-    data = r.json()
+    with metrics.phase("open-meteo", "decode"):
+        data = r.json()
 
     records = []
     lat, lon = payload.get("latitude"), payload.get("longitude")
     timestamps = data.get("hourly", {}).get("time", [])
     # ✅ limit how many records we ingest
-    limit_hours = payload.get("limit_hours", 6)  
     timestamps = timestamps[:limit_hours]
 
-    for param in params["hourly"].split(","):
-        values = data.get("hourly", {}).get(param, [])[:limit_hours]
-        for t, v in zip(timestamps, values):
-            if v is None:  # skip missing values
-                continue
-            records.append(StandardizedRecord(
-                latitude=lat,
-                longitude=lon,
-                parameter=param,
-                value=v,
-                timestamp=datetime.datetime.fromisoformat(t),
-                source="open-meteo"
-            ).model_dump())
+    missing = 0
+    with metrics.phase("open-meteo", "validate"):
+        for param in params["hourly"].split(","):
+            values = data.get("hourly", {}).get(param, [])[:limit_hours]
+            for t, v in zip(timestamps, values):
+                if v is None:  # skip missing values
+                    missing += 1
+                    continue
+                records.append(StandardizedRecord(
+                    latitude=lat,
+                    longitude=lon,
+                    parameter=param,
+                    value=v,
+                    timestamp=datetime.datetime.fromisoformat(t),
+                    source="open-meteo"
+                ).model_dump())
+    metrics.rejected("open-meteo", missing)
     return records
\ No newline at end of file
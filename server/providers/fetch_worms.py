@@ -4,13 +4,19 @@ import os
 import requests
 from models.data_models import StandardizedRecord
 from fastapi import HTTPException
+import metrics
+
+WORMS_BASE_URL = os.environ.get("WORMS_BASE_URL", "https://www.marinespecies.org/rest")
 
 
 def fetch_worms(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     endpoint = payload.get("endpoint", "AphiaRecordsByName")
     params = payload.get("params", {})
-    limit = payload.get("limit", 100)  # default cap at 100
-    base = "https://www.marinespecies.org/rest"
+    try:
+        limit = int(payload.get("limit", 100))  # default cap at 100
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="'limit' must be an integer")
+    base = WORMS_BASE_URL
 
     # Build endpoint-specific URL
     if "scientificname" in params:
@@ -22,11 +28,15 @@ def fetch_worms(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         url = f"{base}/{endpoint}/{aphia_id}"
         params = {}
     else:
-        raise ValueError("WoRMS requires either 'scientificname' or 'AphiaID' in params")
+        raise HTTPException(status_code=400, detail="WoRMS requires either 'scientificname' or 'AphiaID' in params")
 
-    r = requests.get(url, params=params, timeout=30)
+    r = metrics.upstream_get("worms", url, params=params, timeout=30)
     r.raise_for_status()
-    data = r.json()
+    # WoRMS answers a name with no match with 204 and an empty body
+    if r.status_code == 204 or not r.content:
+        raise HTTPException(status_code=404, detail="No data found from WoRMS")
+    with metrics.phase("worms", "decode"):
+        data = r.json()
 
     # ✅ Case 1: API just returns an integer (e.g., AphiaIDByName)
     if isinstance(data, int):
@@ -43,24 +53,25 @@ def fetch_worms(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     # ✅ Apply limit
     data = data[:limit]
 
-    records = []
-    for item in data:
-        record = {
-            "aphiaID": item.get("AphiaID"),
-            "scientificName": item.get("scientificname"),
-            "rank": item.get("rank"),
-            "status": item.get("status"),
-            "valid_name": item.get("valid_name"),
-            "valid_AphiaID": item.get("valid_AphiaID"),
-            "kingdom": item.get("kingdom"),
-            "phylum": item.get("phylum"),
-            "class": item.get("class"),
-            "order": item.get("order"),
-            "family": item.get("family"),
-            "genus": item.get("genus"),
-            "timestamp": datetime.datetime.now().isoformat(),
-            "source": f"worms/{endpoint}"
-        }
-        records.append(record)
+    with metrics.phase("worms", "validate"):
+        records = []
+        for item in data:
+            record = {
+                "aphiaID": item.get("AphiaID"),
+                "scientificName": item.get("scientificname"),
+                "rank": item.get("rank"),
+                "status": item.get("status"),
+                "valid_name": item.get("valid_name"),
+                "valid_AphiaID": item.get("valid_AphiaID"),
+                "kingdom": item.get("kingdom"),
+                "phylum": item.get("phylum"),
+                "class": item.get("class"),
+                "order": item.get("order"),
+                "family": item.get("family"),
+                "genus": item.get("genus"),
+                "timestamp": datetime.datetime.now().isoformat(),
+                "source": f"worms/{endpoint}"
+            }
+            records.append(record)
 
     return records
\ No newline at end of file
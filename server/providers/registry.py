@@ -0,0 +1,119 @@
+import importlib
+import os
+from importlib import metadata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import metrics
+
+ProviderFn = Callable[[Dict[str, Any]], List[Dict[str, Any]]]
+
+ENTRY_POINT_GROUP = "oceanic.providers"
+
+# name -> "module:attribute", resolved only when the provider is first used
+BUILTIN_PROVIDERS: Dict[str, str] = {
+    "open-meteo": "providers.fetch_open_meteo:fetch_open_meteo",
+    "noaa": "providers.fetch_noaa:get_noaa_record",  # 🔹 singular product
+    "obis": "providers.fetch_obis:fetch_obis",
+    "worms": "providers.fetch_worms:fetch_worms",
+    "bold": "providers.fetch_bold:fetch_bold",
+    "fisheries": "providers.fetch_fisheries:fetch_fisheries",
+    "csv": "providers.fetch_csv:fetch_csv",
+    "ftp": "providers.fetch_ftp:fetch_ftp",
+}
+
+
+def _import_spec(spec: str) -> ProviderFn:
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Provider spec must look like 'module:function', got {spec!r}")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr)
+
+
+class ProviderRegistry:
+    """
+    Maps provider names to fetch functions, importing each provider module
+    (and its heavy dependencies) the first time the provider is requested.
+
+    Targets can be a callable, a "module:function" string, or an entry point.
+    If `enabled` is given, only those names are ever registered.
+    """
+
+    def __init__(self, enabled: Optional[Iterable[str]] = None):
+        self.enabled = set(enabled) if enabled is not None else None
+        self._targets: Dict[str, Union[str, ProviderFn, metadata.EntryPoint]] = {}
+        self._loaded: Dict[str, ProviderFn] = {}
+
+    def register(self, name: str, target: Union[str, ProviderFn, metadata.EntryPoint]) -> None:
+        if self.enabled is not None and name not in self.enabled:
+            return
+        self._targets[name] = target
+        self._loaded.pop(name, None)
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        for ep in metadata.entry_points(group=group):
+            self.register(ep.name, ep)
+
+    def get(self, name: str) -> ProviderFn:
+        if name in self._loaded:
+            metrics.CACHE_LOOKUPS.inc("provider_registry", "hit")
+            return self._loaded[name]
+        metrics.CACHE_LOOKUPS.inc("provider_registry", "miss")
+        target = self._targets[name]
+        if isinstance(target, str):
+            fn = _import_spec(target)
+        elif isinstance(target, metadata.EntryPoint):
+            fn = target.load()
+        else:
+            fn = target
+        self._loaded[name] = fn
+        return fn
+
+    def names(self) -> List[str]:
+        return sorted(self._targets)
+
+    def loaded(self) -> List[str]:
+        return sorted(self._loaded)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._targets
+
+    def __getitem__(self, name: str) -> ProviderFn:
+        return self.get(name)
+
+
+def parse_provider_specs(raw: str) -> Dict[str, str]:
+    """
+    Parse "name=module:function" pairs separated by commas or semicolons.
+    Example: "argo=providers.fetch_argo:fetch_argo;csv=providers.fetch_csv:fetch_csv"
+    """
+    specs = {}
+    for item in raw.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, spec = item.partition("=")
+        if not sep:
+            raise ValueError(f"Provider spec must look like 'name=module:function', got {item!r}")
+        specs[name.strip()] = spec.strip()
+    return specs
+
+
+def build_registry(builtins: Optional[Dict[str, Union[str, ProviderFn]]] = None) -> ProviderRegistry:
+    """
+    Build the registry from the built-in providers, installed entry points and
+    environment config:
+
+      OCEANIC_PROVIDERS       comma separated subset to enable, e.g. "noaa,open-meteo"
+      OCEANIC_PROVIDER_SPECS  extra providers, "name=module:function,..."
+    """
+    enabled_raw = os.environ.get("OCEANIC_PROVIDERS", "").strip()
+    enabled = [n.strip() for n in enabled_raw.split(",") if n.strip()] if enabled_raw else None
+
+    registry = ProviderRegistry(enabled=enabled)
+    for name, target in (builtins if builtins is not None else BUILTIN_PROVIDERS).items():
+        registry.register(name, target)
+    registry.load_entry_points()
+    for name, spec in parse_provider_specs(os.environ.get("OCEANIC_PROVIDER_SPECS", "")).items():
+        registry.register(name, spec)
+    return registry
@@ -0,0 +1,130 @@
+"""
+Measure cold-start import time and memory of the API server.
+
+Each measurement runs in a fresh interpreter so nothing is cached between runs.
+
+Usage (from the server directory):
+    python scripts/measure_startup.py
+    python scripts/measure_startup.py --providers noaa,open-meteo --resolve noaa
+    python scripts/measure_startup.py --runs 5 --top 15 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+resolved = {}
+for name in [n for n in sys.argv[1].split(",") if n]:
+    s = time.perf_counter()
+    main.PROVIDERS.get(name)
+    resolved[name] = time.perf_counter() - s
+t2 = time.perf_counter()
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({
+    "import_main_s": t1 - t0,
+    "resolve_s": resolved,
+    "total_s": t2 - t0,
+    "peak_rss_mb": rss_kb / 1024,
+    "modules_loaded": len(sys.modules),
+    "heavy_modules": sorted(m for m in ("pandas", "numpy", "camelot", "pytesseract", "pdf2image", "requests") if m in sys.modules),
+    "providers_registered": main.PROVIDERS.names(),
+    "providers_loaded": main.PROVIDERS.loaded(),
+}))
+"""
+
+
+def _env(providers: str) -> dict:
+    env = dict(os.environ)
+    if providers:
+        env["OCEANIC_PROVIDERS"] = providers
+    return env
+
+
+def run_once(providers: str, resolve: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, resolve],
+        cwd=SERVER_DIR, env=_env(providers), capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_profile(providers: str, resolve: str, top: int) -> list:
+    """
+    Modules imported directly by `main`, plus those imported when resolving
+    providers, ranked by cumulative import time from `python -X importtime`.
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, resolve],
+        cwd=SERVER_DIR, env=_env(providers), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    pending = []  # one level below the next top-level row (children are listed before their parent)
+    main_seen = False
+    for line in out.stderr.splitlines():
+        # "import time:  self_us | cumulative_us | <indent>module", two spaces per nesting level
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        row = {"module": name.strip(), "cumulative_ms": int(cumulative_us) / 1000}
+        if depth == 1:
+            pending.append(row)
+        elif depth == 0:
+            if row["module"] == "main":
+                rows.extend(pending)
+                main_seen = True
+            elif main_seen:
+                # imported after main, i.e. while resolving --resolve providers
+                rows.append(row)
+            pending = []
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--providers", default="", help="OCEANIC_PROVIDERS subset to start with")
+    parser.add_argument("--resolve", default="", help="comma separated providers to resolve after startup")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="show the N slowest imports made by main and provider resolution")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output only")
+    args = parser.parse_args()
+
+    runs = [run_once(args.providers, args.resolve) for _ in range(args.runs)]
+    result = {
+        "runs": args.runs,
+        "providers": args.providers or "all",
+        "import_main_s_median": statistics.median(r["import_main_s"] for r in runs),
+        "total_s_median": statistics.median(r["total_s"] for r in runs),
+        "peak_rss_mb_max": max(r["peak_rss_mb"] for r in runs),
+        "last_run": runs[-1],
+        "slowest_imports": import_profile(args.providers, args.resolve, args.top) if args.top else [],
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"providers:        {result['providers']}")
+    print(f"import main:      {result['import_main_s_median'] * 1000:.1f} ms (median of {args.runs})")
+    print(f"startup + resolve {result['total_s_median'] * 1000:.1f} ms")
+    print(f"peak RSS:         {result['peak_rss_mb_max']:.1f} MB")
+    print(f"heavy modules:    {', '.join(runs[-1]['heavy_modules']) or '-'}")
+    print(f"loaded providers: {', '.join(runs[-1]['providers_loaded']) or '-'}")
+    for row in result["slowest_imports"]:
+        print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import datetime
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from storage.rollups import RollupStore
+from storage.spatial_index import BBox, Polygon, SpatialIndex, record_coords
+from storage.utils import parse_timestamp, source_matches
+
+
+class RecordStore:
+    """
+    In-memory list of ingested records plus a spatial index over the ones
+    that carry coordinates and time-series rollups over the numeric ones.
+    `records` is the plain list served by `/data/`.
+
+    FastAPI runs the sync handlers on a threadpool, so ingest and queries can
+    overlap; `lock` guards the list, the index and the rollups together.
+    """
+
+    def __init__(self, cell_deg: float = 0.25):
+        self.records: List[Dict[str, Any]] = []
+        self.spatial = SpatialIndex(cell_deg=cell_deg)
+        self.rollups = RollupStore(cell_deg=cell_deg)
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        with self.lock:
+            for record in records:
+                record_id = len(self.records)
+                self.records.append(record)
+                coords = record_coords(record)
+                if coords is not None:
+                    self.spatial.insert(record_id, *coords)
+                self.rollups.add(record)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Copy of all records, safe to serialize while ingestion continues."""
+        with self.lock:
+            return list(self.records)
+
+    def query(
+        self,
+        bbox: Optional[BBox] = None,
+        near: Optional[tuple] = None,
+        polygon: Optional[Polygon] = None,
+        sources: Optional[Iterable[str]] = None,
+        parameters: Optional[Iterable[str]] = None,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Records matching every given filter, in ingestion order.
+        near is (lat, lon, radius_km); bbox is (min_lon, min_lat, max_lon, max_lat);
+        polygon is a list of (lon, lat) vertices.
+        """
+        with self.lock:
+            ids: Optional[Set[int]] = None
+            for spatial_ids in (
+                self.spatial.query_bbox(bbox) if bbox is not None else None,
+                self.spatial.query_radius(*near) if near is not None else None,
+                self.spatial.query_polygon(polygon) if polygon is not None else None,
+            ):
+                if spatial_ids is not None:
+                    ids = spatial_ids if ids is None else ids & spatial_ids
+
+            candidates = range(len(self.records)) if ids is None else sorted(ids)
+            wanted_sources = {s.lower() for s in sources} if sources else None
+            wanted_params = set(parameters) if parameters else None
+
+            out = []
+            for i in candidates:
+                record = self.records[i]
+                if wanted_sources is not None and not source_matches(record.get("source"), wanted_sources):
+                    continue
+                if wanted_params is not None and record.get("parameter") not in wanted_params:
+                    continue
+                if start is not None or end is not None:
+                    ts = parse_timestamp(record.get("timestamp"))
+                    if ts is None or (start is not None and ts < start) or (end is not None and ts > end):
+                        continue
+                out.append(record)
+                if limit is not None and len(out) >= limit:
+                    break
+            return out
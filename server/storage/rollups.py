@@ -0,0 +1,151 @@
+import datetime
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage.spatial_index import record_coords, to_float
+from storage.utils import parse_timestamp, source_matches
+
+RESOLUTIONS = ("hourly", "daily", "monthly")
+
+# (source, station or cell, parameter)
+SeriesKey = Tuple[str, str, str]
+
+
+def bucket_start(ts: datetime.datetime, resolution: str) -> datetime.datetime:
+    if resolution == "hourly":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if resolution == "daily":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == "monthly":
+        return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def pick_resolution(start: datetime.datetime, end: datetime.datetime) -> str:
+    """Coarsest resolution that still gives a useful number of points for the span."""
+    span = end - start
+    if span <= datetime.timedelta(days=7):
+        return "hourly"  # <= 168 points
+    if span <= datetime.timedelta(days=366):
+        return "daily"  # <= 366 points
+    return "monthly"
+
+
+def cell_id(lat: float, lon: float, cell_deg: float) -> str:
+    return f"cell:{math.floor(lat / cell_deg) * cell_deg:g},{math.floor(lon / cell_deg) * cell_deg:g}"
+
+
+class RollupStore:
+    """
+    Hourly/daily/monthly count, sum, min and max per (source, station or
+    grid cell, parameter). Each ingested record updates one bucket per
+    resolution, so nothing is recomputed from the raw records.
+    All methods take `lock`, so ingest threads can add while others read.
+    """
+
+    def __init__(self, cell_deg: float = 0.25):
+        self.cell_deg = cell_deg
+        # series -> resolution -> bucket start -> [count, sum, min, max]
+        self._series: Dict[SeriesKey, Dict[str, Dict[datetime.datetime, List[float]]]] = {}
+        self.lock = threading.RLock()
+
+    def series_key(self, record: Dict[str, Any]) -> Optional[SeriesKey]:
+        source, parameter = record.get("source"), record.get("parameter")
+        if not isinstance(source, str) or not isinstance(parameter, str):
+            return None
+        if record.get("station"):
+            return (source, str(record["station"]), parameter)
+        coords = record_coords(record)
+        if coords is None:
+            return None
+        return (source, cell_id(*coords, self.cell_deg), parameter)
+
+    def add(self, record: Dict[str, Any]) -> bool:
+        value = record.get("value")
+        value = to_float(value) if not isinstance(value, bool) else None
+        if value is None:
+            return False
+        ts = parse_timestamp(record.get("timestamp"))
+        key = self.series_key(record)
+        if ts is None or key is None:
+            return False
+
+        with self.lock:
+            by_res = self._series.setdefault(key, {r: {} for r in RESOLUTIONS})
+            for resolution in RESOLUTIONS:
+                buckets = by_res[resolution]
+                b = bucket_start(ts, resolution)
+                agg = buckets.get(b)
+                if agg is None:
+                    buckets[b] = [1, value, value, value]
+                else:
+                    agg[0] += 1
+                    agg[1] += value
+                    if value < agg[2]:
+                        agg[2] = value
+                    if value > agg[3]:
+                        agg[3] = value
+        return True
+
+    def series(
+        self,
+        source: Optional[str] = None,
+        parameter: Optional[str] = None,
+        station: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+    ) -> List[SeriesKey]:
+        wanted_source = {source.lower()} if source else None
+        cell = cell_id(lat, lon, self.cell_deg) if lat is not None and lon is not None else None
+        out = []
+        with self.lock:
+            for key in self._series:
+                src, series_id, param = key
+                if wanted_source is not None and not source_matches(src, wanted_source):
+                    continue
+                if parameter is not None and param != parameter:
+                    continue
+                if station is not None and series_id != station:
+                    continue
+                if cell is not None and series_id != cell:
+                    continue
+                out.append(key)
+        return sorted(out)
+
+    def extent(self, keys: List[SeriesKey]) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+        """First and last hour covered by the given series."""
+        with self.lock:
+            hours = [b for key in keys for b in self._series[key]["hourly"]]
+        if not hours:
+            return None
+        return min(hours), max(hours) + datetime.timedelta(hours=1)
+
+    def query(
+        self,
+        keys: List[SeriesKey],
+        resolution: str,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        first = bucket_start(start, resolution) if start is not None else None
+        out = []
+        for key in keys:
+            with self.lock:
+                buckets = [(b, list(agg)) for b, agg in self._series[key][resolution].items()]
+            points = [
+                {
+                    "t": b.isoformat(),
+                    "min": agg[2],
+                    "mean": agg[1] / agg[0],
+                    "max": agg[3],
+                    "count": agg[0],
+                }
+                for b, agg in sorted(buckets)
+                if (first is None or b >= first) and (end is None or b <= end)
+            ]
+            source, series_id, parameter = key
+            out.append({"source": source, "series": series_id, "parameter": parameter, "points": points})
+        return out
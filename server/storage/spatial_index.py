@@ -0,0 +1,144 @@
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# (min_lon, min_lat, max_lon, max_lat), GeoJSON order
+BBox = Tuple[float, float, float, float]
+# [(lon, lat), ...]
+Polygon = Sequence[Tuple[float, float]]
+
+
+def to_float(value) -> Optional[float]:
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        return None
+    return f if math.isfinite(f) else None
+
+
+def record_coords(record: dict) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a record; providers use either latitude/longitude or lat/lon."""
+    lat = to_float(record.get("latitude", record.get("lat")))
+    lon = to_float(record.get("longitude", record.get("lon")))
+    if lat is None or lon is None or not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lon: float, radius_km: float) -> BBox:
+    """Bounding box enclosing a circle; may have min_lon > max_lon across the antimeridian."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    if min_lat <= -90 or max_lat >= 90:
+        return (-180.0, min_lat, 180.0, max_lat)
+    # widest longitude reached by the circle (at the tangent point, not at `lat`)
+    s = math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))
+    if s >= 1:
+        return (-180.0, min_lat, 180.0, max_lat)
+    dlon = math.degrees(math.asin(s))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180:
+        min_lon += 360
+    if max_lon > 180:
+        max_lon -= 360
+    return (min_lon, min_lat, max_lon, max_lat)
+
+
+def in_bbox(lat: float, lon: float, bbox: BBox) -> bool:
+    min_lon, min_lat, max_lon, max_lat = bbox
+    if not (min_lat <= lat <= max_lat):
+        return False
+    if min_lon <= max_lon:
+        return min_lon <= lon <= max_lon
+    return lon >= min_lon or lon <= max_lon  # crosses the antimeridian
+
+
+def polygon_bbox(polygon: Polygon) -> BBox:
+    lons = [p[0] for p in polygon]
+    lats = [p[1] for p in polygon]
+    return (min(lons), min(lats), max(lons), max(lats))
+
+
+def in_polygon(lat: float, lon: float, polygon: Polygon) -> bool:
+    """Ray casting point-in-polygon on plain lon/lat coordinates."""
+    inside = False
+    n = len(polygon)
+    j = n - 1
+    for i in range(n):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class SpatialIndex:
+    """
+    Grid index over record positions. Each record id is bucketed into a
+    fixed-size lat/lon cell, so a region query only visits the cells that
+    overlap it and then checks the exact geometry on those candidates.
+    """
+
+    def __init__(self, cell_deg: float = 0.25):
+        self.cell_deg = cell_deg
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._coords: Dict[int, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._coords)
+
+    def cell_key(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg)))
+
+    def insert(self, record_id: int, lat: float, lon: float) -> None:
+        self._coords[record_id] = (lat, lon)
+        self._cells.setdefault(self.cell_key(lat, lon), []).append(record_id)
+
+    def coords(self, record_id: int) -> Optional[Tuple[float, float]]:
+        return self._coords.get(record_id)
+
+    def _lon_ranges(self, min_lon: float, max_lon: float) -> List[Tuple[int, int]]:
+        to_cell = lambda x: int(math.floor(x / self.cell_deg))
+        if min_lon <= max_lon:
+            return [(to_cell(min_lon), to_cell(max_lon))]
+        return [(to_cell(min_lon), to_cell(180.0)), (to_cell(-180.0), to_cell(max_lon))]
+
+    def _candidates(self, bbox: BBox) -> Iterable[int]:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        r0, r1 = self.cell_key(min_lat, 0)[0], self.cell_key(max_lat, 0)[0]
+        lon_ranges = self._lon_ranges(min_lon, max_lon)
+        n_cells = (r1 - r0 + 1) * sum(c1 - c0 + 1 for c0, c1 in lon_ranges)
+
+        # A huge box covers more cells than are occupied; walk the occupied ones instead
+        if n_cells > len(self._cells):
+            for (row, col), ids in self._cells.items():
+                if r0 <= row <= r1 and any(c0 <= col <= c1 for c0, c1 in lon_ranges):
+                    yield from ids
+            return
+
+        for row in range(r0, r1 + 1):
+            for c0, c1 in lon_ranges:
+                for col in range(c0, c1 + 1):
+                    yield from self._cells.get((row, col), ())
+
+    def query_bbox(self, bbox: BBox) -> Set[int]:
+        return {i for i in self._candidates(bbox) if in_bbox(*self._coords[i], bbox)}
+
+    def query_radius(self, lat: float, lon: float, radius_km: float) -> Set[int]:
+        return {
+            i for i in self._candidates(radius_bbox(lat, lon, radius_km))
+            if haversine_km(lat, lon, *self._coords[i]) <= radius_km
+        }
+
+    def query_polygon(self, polygon: Polygon) -> Set[int]:
+        return {i for i in self._candidates(polygon_bbox(polygon)) if in_polygon(*self._coords[i], polygon)}
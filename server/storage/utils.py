@@ -0,0 +1,26 @@
+import datetime
+from typing import Any, Optional, Set
+
+
+def parse_timestamp(value: Any) -> Optional[datetime.datetime]:
+    """Naive UTC datetime from a record or query timestamp (datetime or ISO string)."""
+    if isinstance(value, datetime.datetime):
+        ts = value
+    elif isinstance(value, str) and value:
+        try:
+            ts = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def source_matches(record_source: Any, wanted: Set[str]) -> bool:
+    """Case-insensitive match on the full source or its prefix, so "obis" matches "obis/occurrence"."""
+    if not isinstance(record_source, str):
+        return False
+    s = record_source.lower()
+    return s in wanted or s.split("/", 1)[0] in wanted
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+import requests
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+import main
+import metrics
+from metrics import Counter, Histogram, UpstreamDataError
+from providers.registry import ProviderRegistry
+
+
+def test_histogram_buckets_are_cumulative_and_end_with_inf():
+    h = Histogram("t_seconds", "test", ("provider",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 5.0):
+        h.observe(v, "obis")
+
+    lines = h.render()
+    assert lines[:2] == ["# HELP t_seconds test", "# TYPE t_seconds histogram"]
+    assert lines[2:] == [
+        't_seconds_bucket{provider="obis",le="0.1"} 1',
+        't_seconds_bucket{provider="obis",le="1"} 3',
+        't_seconds_bucket{provider="obis",le="+Inf"} 4',
+        't_seconds_sum{provider="obis"} 6.05',
+        't_seconds_count{provider="obis"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    c = Counter("t_total", "test", ("route",))
+    c.inc('a"b\\c\nd')
+    c.inc("plain", amount=2.5)
+    assert c.render()[2:] == [
+        't_total{route="a\\"b\\\\c\\nd"} 1',
+        't_total{route="plain"} 2.5',
+    ]
+
+
+def test_unlabelled_counter_renders_bare_name():
+    c = Counter("t_total", "test")
+    c.inc()
+    assert c.render()[-1] == "t_total 1"
+
+
+@pytest.mark.parametrize("name", metrics.DATA_PHASES)
+def test_phase_wraps_errors_in_data_phases(name):
+    with pytest.raises(UpstreamDataError) as info:
+        with metrics.phase("obis", name):
+            raise KeyError("results")
+    assert (info.value.provider, info.value.phase) == ("obis", name)
+    assert isinstance(info.value.__cause__, KeyError)
+
+
+def test_phase_lets_http_errors_and_other_phases_through():
+    with pytest.raises(HTTPException):
+        with metrics.phase("worms", "decode"):
+            raise HTTPException(status_code=404, detail="No data found from WoRMS")
+    with pytest.raises(ValueError):
+        with metrics.phase("worms", "upstream"):
+            raise ValueError("not a data phase")
+
+
+def test_server_timing_value():
+    assert metrics.server_timing({"upstream": 0.1204, "decode": 0.0031}) == "upstream;dur=120.4, decode;dur=3.1"
+    assert metrics.server_timing({}) == ""
+
+
+@pytest.mark.parametrize("error, expected", [
+    (UpstreamDataError("obis", "decode", ValueError("x")), ("invalid_data", 502)),
+    (requests.JSONDecodeError("Expecting value", "", 0), ("invalid_data", 502)),
+    (requests.Timeout(), ("upstream_timeout", 504)),
+    (requests.HTTPError(), ("upstream_error", 502)),
+    (requests.ConnectionError(), ("upstream_unreachable", 502)),
+    (RuntimeError("bug"), ("internal_error", 500)),
+])
+def test_classify_error(error, expected):
+    assert main._classify_error(error) == expected
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ProviderRegistry()
+    monkeypatch.setattr(main, "PROVIDERS", registry)
+    return registry
+
+
+def _ingest_status(registry, fetch) -> int:
+    registry.register("stub", fetch)
+    with pytest.raises(HTTPException) as info:
+        main.ingest(main.IngestRequest(provider="stub", payload={}))
+    return info.value.status_code
+
+
+def test_ingest_keeps_provider_400_and_classifies_the_rest(registry):
+    def bad_payload(payload):
+        raise HTTPException(status_code=400, detail="'limit' must be an integer")
+
+    def bad_upstream_data(payload):
+        with metrics.phase("stub", "decode"):
+            raise ValueError("not json")
+
+    def timeout(payload):
+        raise requests.Timeout()
+
+    def bug(payload):
+        raise RuntimeError("bug")
+
+    before = metrics.INGEST_REQUESTS.value("stub", "http_400")
+    assert _ingest_status(registry, bad_payload) == 400
+    assert metrics.INGEST_REQUESTS.value("stub", "http_400") == before + 1
+
+    before = metrics.INGEST_REQUESTS.value("stub", "invalid_data")
+    assert _ingest_status(registry, bad_upstream_data) == 502
+    assert metrics.INGEST_REQUESTS.value("stub", "invalid_data") == before + 1
+
+    assert _ingest_status(registry, timeout) == 504
+    assert _ingest_status(registry, bug) == 500
+
+
+def test_profiled_request_gets_server_timing_header():
+    scope = {"type": "http", "method": "POST", "path": "/ingest/", "headers": [(b"x-profile", b"1")]}
+
+    async def call_next(request):
+        with metrics.phase("stub", "total"):
+            pass
+        return Response("ok")
+
+    response = asyncio.run(main.instrument(Request(scope), call_next))
+    names = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+    assert names == ["total", "request"]
+    assert all(part.split(";dur=")[1] for part in response.headers["server-timing"].split(", "))
+
+
+def test_unprofiled_request_has_no_server_timing_header():
+    scope = {"type": "http", "method": "GET", "path": "/data/", "headers": []}
+
+    async def call_next(request):
+        return Response("ok")
+
+    response = asyncio.run(main.instrument(Request(scope), call_next))
+    assert "server-timing" not in response.headers
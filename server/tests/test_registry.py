@@ -0,0 +1,109 @@
+import sys
+
+import pytest
+
+from providers.registry import BUILTIN_PROVIDERS, ProviderRegistry, build_registry, parse_provider_specs
+
+
+def _fetch_stub(payload):
+    return [payload]
+
+
+@pytest.fixture
+def provider_module(tmp_path, monkeypatch):
+    """An importable provider module that nothing has imported yet."""
+    name = "oceanic_test_provider"
+    (tmp_path / f"{name}.py").write_text("def fetch(payload):\n    return [{'echo': payload}]\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    yield name
+    sys.modules.pop(name, None)
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    monkeypatch.delenv("OCEANIC_PROVIDERS", raising=False)
+    monkeypatch.delenv("OCEANIC_PROVIDER_SPECS", raising=False)
+
+
+def test_spec_is_imported_only_on_first_get(provider_module):
+    registry = ProviderRegistry()
+    registry.register("echo", f"{provider_module}:fetch")
+
+    assert "echo" in registry
+    assert provider_module not in sys.modules
+    assert registry.loaded() == []
+
+    fetch = registry.get("echo")
+    assert provider_module in sys.modules
+    assert fetch({"a": 1}) == [{"echo": {"a": 1}}]
+    assert registry.loaded() == ["echo"]
+    assert registry["echo"] is fetch
+
+
+def test_callable_targets_and_reregistration():
+    registry = ProviderRegistry()
+    registry.register("stub", _fetch_stub)
+    assert registry.get("stub") is _fetch_stub
+
+    registry.register("stub", lambda payload: [])
+    assert registry.loaded() == []
+    assert registry.get("stub")({}) == []
+
+
+def test_bad_spec_and_unknown_name():
+    registry = ProviderRegistry()
+    registry.register("broken", "no_colon_here")
+    with pytest.raises(ValueError, match="module:function"):
+        registry.get("broken")
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_enabled_subset_drops_other_names():
+    registry = ProviderRegistry(enabled=["obis"])
+    registry.register("obis", _fetch_stub)
+    registry.register("worms", _fetch_stub)
+
+    assert "obis" in registry
+    assert "worms" not in registry
+    assert registry.names() == ["obis"]
+
+
+def test_build_registry_defaults_to_all_builtins():
+    registry = build_registry()
+    assert set(BUILTIN_PROVIDERS) <= set(registry.names())
+    assert registry.loaded() == []
+
+
+def test_build_registry_filters_by_oceanic_providers(monkeypatch):
+    monkeypatch.setenv("OCEANIC_PROVIDERS", " noaa, open-meteo ,")
+    registry = build_registry()
+
+    assert registry.names() == ["noaa", "open-meteo"]
+    assert "obis" not in registry
+    assert "csv" not in registry
+
+
+def test_build_registry_adds_oceanic_provider_specs(monkeypatch, provider_module):
+    monkeypatch.setenv("OCEANIC_PROVIDER_SPECS", f"echo={provider_module}:fetch")
+    registry = build_registry(builtins={})
+
+    assert registry.names() == ["echo"]
+    assert provider_module not in sys.modules
+    assert registry.get("echo")({}) == [{"echo": {}}]
+
+
+def test_oceanic_providers_also_filters_extra_specs(monkeypatch, provider_module):
+    monkeypatch.setenv("OCEANIC_PROVIDERS", "obis")
+    monkeypatch.setenv("OCEANIC_PROVIDER_SPECS", f"echo={provider_module}:fetch")
+    registry = build_registry()
+
+    assert registry.names() == ["obis"]
+
+
+def test_parse_provider_specs():
+    assert parse_provider_specs("") == {}
+    assert parse_provider_specs("a=m.x:f; b = m.y:g ,") == {"a": "m.x:f", "b": "m.y:g"}
+    with pytest.raises(ValueError, match="name=module:function"):
+        parse_provider_specs("a=m.x:f,argo")
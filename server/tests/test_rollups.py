@@ -0,0 +1,85 @@
+import datetime
+
+import pytest
+
+from storage.rollups import RollupStore, bucket_start, cell_id, pick_resolution
+
+T0 = datetime.datetime(2025, 1, 31, 23, 54, 30, 123)
+
+
+def record(value, ts, **extra):
+    return {"source": "NOAA", "station": "8723214", "parameter": "water_temperature", "value": value, "timestamp": ts, **extra}
+
+
+def test_bucket_start_boundaries():
+    assert bucket_start(T0, "hourly") == datetime.datetime(2025, 1, 31, 23)
+    assert bucket_start(T0, "daily") == datetime.datetime(2025, 1, 31)
+    assert bucket_start(T0, "monthly") == datetime.datetime(2025, 1, 1)
+    # exact boundary stays in its own bucket
+    midnight = datetime.datetime(2025, 2, 1)
+    assert bucket_start(midnight, "hourly") == midnight
+    assert bucket_start(midnight, "monthly") == midnight
+    with pytest.raises(ValueError):
+        bucket_start(T0, "weekly")
+
+
+def test_pick_resolution_by_span():
+    start = datetime.datetime(2025, 1, 1)
+    assert pick_resolution(start, start + datetime.timedelta(days=7)) == "hourly"
+    assert pick_resolution(start, start + datetime.timedelta(days=7, seconds=1)) == "daily"
+    assert pick_resolution(start, start + datetime.timedelta(days=366)) == "daily"
+    assert pick_resolution(start, start + datetime.timedelta(days=367)) == "monthly"
+
+
+def test_cell_id_floors_to_grid():
+    assert cell_id(9.93, 76.26, 0.25) == "cell:9.75,76.25"
+    assert cell_id(-0.1, -0.1, 0.25) == "cell:-0.25,-0.25"
+
+
+def test_incremental_min_mean_max_count():
+    store = RollupStore()
+    for v in (3.0, 1.0, 5.0, 7.0):
+        assert store.add(record(v, T0))
+    keys = store.series(source="noaa", parameter="water_temperature")
+    assert keys == [("NOAA", "8723214", "water_temperature")]
+
+    (series,) = store.query(keys, "hourly")
+    assert series["points"] == [{"t": "2025-01-31T23:00:00", "min": 1.0, "mean": 4.0, "max": 7.0, "count": 4}]
+
+
+def test_records_split_across_bucket_boundary():
+    store = RollupStore()
+    store.add(record(1.0, datetime.datetime(2025, 1, 31, 23, 59)))
+    store.add(record(3.0, datetime.datetime(2025, 2, 1, 0, 0)))
+    keys = store.series()
+
+    hourly = store.query(keys, "hourly")[0]["points"]
+    monthly = store.query(keys, "monthly")[0]["points"]
+    assert [p["count"] for p in hourly] == [1, 1]
+    assert [(p["t"], p["mean"]) for p in monthly] == [("2025-01-01T00:00:00", 1.0), ("2025-02-01T00:00:00", 3.0)]
+
+
+def test_query_time_window_and_extent():
+    store = RollupStore()
+    for h in range(48):
+        store.add(record(float(h), datetime.datetime(2025, 3, 1) + datetime.timedelta(hours=h)))
+    keys = store.series()
+    assert store.extent(keys) == (datetime.datetime(2025, 3, 1), datetime.datetime(2025, 3, 3))
+
+    # a start inside a day still returns that day's bucket
+    daily = store.query(keys, "daily", start=datetime.datetime(2025, 3, 2, 12))[0]["points"]
+    assert [p["t"] for p in daily] == ["2025-03-02T00:00:00"]
+    assert daily[0]["min"] == 24.0 and daily[0]["max"] == 47.0
+
+
+def test_cell_series_and_skipped_records():
+    store = RollupStore()
+    cell_record = {"source": "open-meteo", "parameter": "wave_height", "latitude": 9.93, "longitude": 76.26, "value": 1.5, "timestamp": "2025-01-01T00:00"}
+    assert store.add(cell_record)
+    assert store.series(lat=9.8, lon=76.3) == [("open-meteo", "cell:9.75,76.25", "wave_height")]
+
+    assert not store.add(record(None, T0))
+    assert not store.add(record(True, T0))
+    assert not store.add(record("n/a", T0))
+    assert not store.add(record(1.0, "not a time"))
+    assert not store.add({"source": "x", "parameter": "y", "value": 1.0, "timestamp": T0})  # no station or coords
@@ -0,0 +1,117 @@
+import pytest
+
+from storage.spatial_index import (
+    SpatialIndex,
+    haversine_km,
+    in_bbox,
+    in_polygon,
+    polygon_bbox,
+    radius_bbox,
+    record_coords,
+)
+
+KOCHI = (9.93, 76.26)
+SQUARE = [(76.0, 9.0), (77.0, 9.0), (77.0, 10.0), (76.0, 10.0)]
+
+
+def test_record_coords_reads_both_key_styles_and_rejects_bad_values():
+    assert record_coords({"latitude": 9.9, "longitude": 76.2}) == (9.9, 76.2)
+    assert record_coords({"lat": "58.35", "lon": "-3.2"}) == (58.35, -3.2)
+    assert record_coords({"latitude": None, "longitude": 1}) is None
+    assert record_coords({"lat": "nan", "lon": "1"}) is None
+    assert record_coords({"latitude": 91, "longitude": 0}) is None
+
+
+def test_haversine_known_distance():
+    # one degree of latitude is ~111.2 km
+    assert haversine_km(0, 0, 1, 0) == pytest.approx(111.2, abs=0.1)
+    assert haversine_km(*KOCHI, *KOCHI) == 0
+
+
+def test_in_bbox_across_antimeridian():
+    bbox = (170.0, -10.0, -170.0, 10.0)
+    assert in_bbox(0, 175, bbox)
+    assert in_bbox(0, -175, bbox)
+    assert in_bbox(0, 180, bbox)
+    assert not in_bbox(0, 0, bbox)
+    assert not in_bbox(11, 175, bbox)
+
+
+def test_radius_bbox_wraps_antimeridian():
+    min_lon, _, max_lon, _ = radius_bbox(0, 179.9, 50)
+    assert min_lon > max_lon
+    assert in_bbox(0, -179.9, radius_bbox(0, 179.9, 50))
+
+
+def test_radius_bbox_near_pole_covers_all_longitudes():
+    min_lon, min_lat, max_lon, max_lat = radius_bbox(89.9, 0, 50)
+    assert (min_lon, max_lon) == (-180.0, 180.0)
+    assert max_lat == 90.0
+    assert min_lat < 89.9
+
+
+def test_radius_bbox_reaches_the_circles_widest_longitude():
+    # at high latitude the circle bulges poleward of `lat`, wider than r / (R cos lat)
+    point = (81.06, 26.57)
+    assert haversine_km(80, 0, *point) < 500
+    assert in_bbox(*point, radius_bbox(80, 0, 500))
+
+    index = SpatialIndex()
+    index.insert(0, *point)
+    assert index.query_radius(80, 0, 500) == {0}
+
+
+def test_polygon_bbox_and_point_in_polygon():
+    assert polygon_bbox(SQUARE) == (76.0, 9.0, 77.0, 10.0)
+    assert in_polygon(9.5, 76.5, SQUARE)
+    assert not in_polygon(10.5, 76.5, SQUARE)
+    assert not in_polygon(9.5, 77.5, SQUARE)
+
+
+def test_point_in_concave_polygon():
+    # U shape open at the top: the notch between x=1..2 above y=1 is outside
+    u = [(0, 0), (3, 0), (3, 3), (2, 3), (2, 1), (1, 1), (1, 3), (0, 3)]
+    assert in_polygon(2, 0.5, u)
+    assert not in_polygon(2, 1.5, u)
+    assert in_polygon(2, 2.5, u)
+
+
+@pytest.fixture
+def index():
+    idx = SpatialIndex(cell_deg=0.25)
+    points = {
+        0: KOCHI,
+        1: (9.95, 76.30),  # a few km from Kochi
+        2: (13.08, 80.29),  # Chennai
+        3: (0.0, 179.95),
+        4: (0.0, -179.95),
+        5: (89.95, 45.0),
+        6: (89.95, -135.0),
+    }
+    for i, (lat, lon) in points.items():
+        idx.insert(i, lat, lon)
+    return idx
+
+
+def test_query_radius(index):
+    assert index.query_radius(*KOCHI, 50) == {0, 1}
+    assert index.query_radius(*KOCHI, 800) == {0, 1, 2}
+
+
+def test_query_radius_across_antimeridian_and_pole(index):
+    assert index.query_radius(0.0, 179.95, 20) == {3, 4}
+    # the two polar points are on opposite sides of the pole, ~11 km apart
+    assert index.query_radius(89.95, 45.0, 20) == {5, 6}
+
+
+def test_query_bbox_uses_wrapped_box(index):
+    assert index.query_bbox((179.0, -1.0, -179.0, 1.0)) == {3, 4}
+    assert index.query_bbox((75.0, 9.0, 77.0, 11.0)) == {0, 1}
+
+
+def test_query_bbox_whole_world_walks_occupied_cells(index):
+    assert index.query_bbox((-180.0, -90.0, 180.0, 90.0)) == set(range(7))
+
+
+def test_query_polygon(index):
+    assert index.query_polygon(SQUARE) == {0, 1}
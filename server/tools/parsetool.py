@@ -1,8 +1,5 @@
 import re
 from typing import Dict, List, Any
-from pdf2image import convert_from_path
-import pytesseract
-import camelot
 
 SECTION_HEADERS = [
     "ABSTRACT", "INTRODUCTION", "MATERIALS AND METHODS", "METHODS", "METHODOLOGY",
@@ -12,6 +9,9 @@ SECTION_HEADERS = [
 
 def extract_text_ocr(pdf_file: str) -> Dict[str, Any]:
     """OCR scanned PDF page by page."""
+    from pdf2image import convert_from_path
+    import pytesseract
+
     try:
         pages_text = []
         images = convert_from_path(pdf_file, dpi=300)
@@ -50,6 +50,8 @@ def split_sections_from_text(full_text: str) -> Dict[str, str]:
 
 def extract_tables_ocr(pdf_file: str) -> List[Dict[str, Any]]:
     """Extract tables (if possible) using Camelot."""
+    import camelot
+
     out = []
     try:
         tables = camelot.read_pdf(pdf_file, pages="all", flavor="lattice")